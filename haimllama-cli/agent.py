@@ -5,7 +5,7 @@ import re
 from typing import Callable
 
 from ollama_client import OllamaClient
-from tools import TOOL_SCHEMAS, dispatch
+from tools import TOOL_SCHEMAS, TOOL_SCHEMAS_ETAG, TOOL_SCHEMAS_JSON, dispatch
 from logger import get_logger
 
 log = get_logger("agent")
@@ -89,10 +89,12 @@ class Agent:
         on_tool_call: Callable[[str, dict], None] | None = None,
         on_tool_result: Callable[[str, str], None] | None = None,
         on_token: Callable[[str], None] | None = None,
+        use_tools: bool = True,
     ):
         self.model = model
         self.client = client
         self.max_iterations = max_iterations
+        self.use_tools = use_tools
         self.on_tool_call = on_tool_call
         self.on_tool_result = on_tool_result
         self.on_token = on_token
@@ -101,8 +103,8 @@ class Agent:
         if system_prompt:
             self.messages.append({"role": "system", "content": system_prompt})
 
-        log.info("Agent created — model=%s  max_iter=%d  tools=%d",
-                 model, max_iterations, len(TOOL_SCHEMAS))
+        log.info("Agent created — model=%s  max_iter=%d  tools=%d  schemas=%s",
+                 model, max_iterations, len(TOOL_SCHEMAS) if use_tools else 0, TOOL_SCHEMAS_ETAG)
 
     def _run_tool_calls(self, tool_calls: list[dict]) -> list[dict]:
         """Execute tool calls and return tool-result messages.
@@ -177,7 +179,7 @@ class Agent:
             for chunk in self.client.chat(
                 model=self.model,
                 messages=self.messages,
-                tools=TOOL_SCHEMAS,
+                tools=TOOL_SCHEMAS_JSON if self.use_tools else None,
                 stream=True,
             ):
                 msg = chunk.get("message", {})
@@ -65,7 +65,8 @@ HELP_TEXT = """
 
 [bold]Permissions:[/bold]
   Tools are classified by risk level:
-    [green]safe[/green]      read_file, list_dir, find_files, grep, fetch_url  → auto-approved
+    [green]safe[/green]      read_file, list_dir, find_files, grep,
+              fetch_url, fetch_urls                           → auto-approved
     [yellow]confirm[/yellow]   write_file, edit_file, run_tests, python_eval   → prompt [y/n/a/A]
     [bold red]dangerous[/bold red] shell                                          → prompt with warning
 
@@ -282,7 +283,7 @@ def repl(
     console.print(
         Panel(
             f"[bold]Model:[/bold] [cyan]{model_holder[0]}[/cyan]  "
-            f"[bold]Tools:[/bold] {len(TOOL_SCHEMAS)} available  "
+            f"[bold]Tools:[/bold] {len(TOOL_SCHEMAS) if agent.use_tools else 0} available  "
             f"[bold]Permissions:[/bold] {perm_mode}\n"
             f"[dim]Type [bold]/help[/bold] for commands, [bold]/exit[/bold] to quit[/dim]",
             title="[bold magenta]haimllama-cli[/bold magenta]",
@@ -318,7 +319,7 @@ def repl(
                 console.print("[dim]Conversation cleared.[/dim]")
 
             elif cmd == "/tools":
-                for schema in TOOL_SCHEMAS:
+                for schema in TOOL_SCHEMAS if agent.use_tools else ():
                     fn = schema["function"]
                     console.print(f"  [cyan]{fn['name']}[/cyan]  {fn['description'][:80]}")
 
@@ -460,12 +461,9 @@ def main():
         client=client,
         system_prompt=system,
         max_iterations=args.max_iter,
+        use_tools=not args.no_tools,
     )
 
-    if args.no_tools:
-        from tools import TOOL_SCHEMAS as _schemas
-        _schemas.clear()
-
     # ── Permission session ────────────────────────────────────────────────
     # One-shot / piped mode is non-interactive: auto-approve by default so
     # scripts work without hanging.  Pass --auto-approve to force it in REPL too.
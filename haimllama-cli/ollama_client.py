@@ -25,13 +25,16 @@ class OllamaClient:
         self,
         model: str,
         messages: list[dict],
-        tools: list[dict] | None = None,
+        tools: list[dict] | bytes | None = None,
         stream: bool = True,
     ) -> Iterator[dict]:
         """
         Yields streaming chunks. Each chunk is the parsed JSON object from
         Ollama's /api/chat streaming response.
 
+        *tools* may be a list of schemas or their pre-serialized JSON bytes,
+        which are spliced into the request body without re-encoding.
+
         When stream=False (tool-call mode), yields a single dict.
         """
         payload: dict = {
@@ -39,13 +42,21 @@ class OllamaClient:
             "messages": messages,
             "stream": stream,
         }
-        if tools:
+        body: dict = {"json": payload}
+        if isinstance(tools, bytes):
+            if tools:
+                encoded = json.dumps(payload, separators=(",", ":")).encode()
+                body = {
+                    "content": encoded[:-1] + b',"tools":' + tools + b"}",
+                    "headers": {"Content-Type": "application/json"},
+                }
+        elif tools:
             payload["tools"] = tools
 
         with self._client.stream(
             "POST",
             f"{self.base_url}/api/chat",
-            json=payload,
+            **body,
             timeout=None,
         ) as resp:
             resp.raise_for_status()
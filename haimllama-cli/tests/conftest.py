@@ -0,0 +1,16 @@
+"""Shared pytest configuration for the haimllama-cli test suite."""
+
+import sys
+
+# Skip writing .pyc files for the modules under test and the rewritten tests
+sys.dont_write_bytecode = True
+
+import pytest  # noqa: E402
+
+import tools  # noqa: E402 — imported once per worker; every test module shares it
+
+
+@pytest.fixture(scope="session")
+def tools_mod():
+    """The already-imported ``tools`` module, for tests that reach into its internals."""
+    return tools
@@ -1,15 +1,12 @@
 """Unit tests for agent.py — Agent class and helper functions."""
 
-import sys
 import json
-from pathlib import Path
 from unittest.mock import MagicMock, patch, call
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from agent import Agent, _sanitize_args, _extract_text_tool_calls
+from tools import TOOL_SCHEMAS_JSON
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
@@ -145,6 +142,20 @@ class TestAgentInit:
         assert agent.max_iterations == 5
 
 
+# ── Agent tool schemas ─────────────────────────────────────────────────────────
+
+class TestAgentToolSchemas:
+    def test_sends_serialized_schemas_by_default(self):
+        client = mock_client([make_chunk("hi", done=True)])
+        Agent(model="test", client=client).run("hello")
+        assert client.chat.call_args.kwargs["tools"] is TOOL_SCHEMAS_JSON
+
+    def test_no_tools_sends_none(self):
+        client = mock_client([make_chunk("hi", done=True)])
+        Agent(model="test", client=client, use_tools=False).run("hello")
+        assert client.chat.call_args.kwargs["tools"] is None
+
+
 # ── Agent.clear ────────────────────────────────────────────────────────────────
 
 class TestAgentClear:
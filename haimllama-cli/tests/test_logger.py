@@ -1,13 +1,10 @@
 """Unit tests for logger.py — setup_logging and get_logger."""
 
 import logging
-import sys
 from pathlib import Path
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 import logger as logger_module
 from logger import setup_logging, get_logger
 
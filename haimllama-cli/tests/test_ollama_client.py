@@ -1,14 +1,10 @@
 """Unit tests for ollama_client.py."""
 
-import sys
 import json
-from pathlib import Path
 from unittest.mock import MagicMock, patch, PropertyMock
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from ollama_client import OllamaClient
 
 
@@ -190,6 +186,22 @@ class TestChat:
         _, kwargs = instance._client.stream.call_args
         assert "tools" not in kwargs["json"]
 
+    def test_preserialized_tools_spliced_into_body(self):
+        lines = [json.dumps({"message": {"content": ""}, "done": True})]
+        stream_ctx = make_stream_response(lines)
+        instance = OllamaClient()
+        instance._client = MagicMock()
+        instance._client.stream.return_value = stream_ctx
+
+        tools = [{"type": "function", "function": {"name": "shell"}}]
+        msgs = [{"role": "user", "content": "hi"}]
+        list(instance.chat(model="test", messages=msgs, tools=json.dumps(tools).encode()))
+
+        _, kwargs = instance._client.stream.call_args
+        assert "json" not in kwargs
+        body = json.loads(kwargs["content"])
+        assert body == {"model": "test", "messages": msgs, "stream": True, "tools": tools}
+
     def test_correct_model_sent(self):
         lines = [json.dumps({"message": {"content": ""}, "done": True})]
         stream_ctx = make_stream_response(lines)
@@ -1,13 +1,28 @@
 """Tool implementations for the agentic CLI."""
 
+import asyncio
+import atexit
+import codecs
 import subprocess
 import os
+import fnmatch
+import functools
 import glob
+import hashlib
+import importlib.util
+import inspect
+import itertools
 import json
+import locale
+import mmap
 import re
 import textwrap
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
 import httpx
 
@@ -283,21 +298,108 @@ TOOL_SCHEMAS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "fetch_urls",
+            "description": "Fetch several URLs concurrently (HTTP GET). Returns each response in input order.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "urls": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "URLs to fetch.",
+                    },
+                    "headers": {
+                        "type": "object",
+                        "description": "Optional HTTP headers sent with every request.",
+                    },
+                },
+                "required": ["urls"],
+            },
+        },
+    },
 ]
 
 
 # ── Implementations ────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int) -> re.Pattern:
+    """Compile a grep regex, cached since the agent often re-greps the same pattern."""
+    return re.compile(pattern, flags)
+
+
+@functools.lru_cache(maxsize=512)
+def _p(path: str) -> Path:
+    """``Path(path).expanduser()``, cached since the agent revisits the same paths."""
+    return Path(path).expanduser()
+
+
+_STREAM_TAIL = 65_536  # chars of each output stream kept by run_shell
+
+
+class _StreamTail:
+    """Drains a text pipe, keeping only its last *limit* characters."""
+
+    def __init__(self, limit: int = _STREAM_TAIL):
+        self.buf: deque[str] = deque(maxlen=limit)
+        self.total = 0
+
+    def drain(self, pipe) -> None:
+        for chunk in iter(lambda: pipe.read(8192), ""):
+            self.total += len(chunk)
+            self.buf.extend(chunk)
+        pipe.close()
+
+    def text(self) -> str:
+        tail = "".join(self.buf)
+        return "...(truncated)\n" + tail if self.total > len(tail) else tail
+
+
+def _run_capture(command: str, cwd: str | None, timeout: float | None) -> subprocess.CompletedProcess:
+    """Run *command* in a shell, keeping a bounded tail of stdout and stderr.
+
+    Unlike ``subprocess.run(capture_output=True)`` memory stays fixed however
+    much the command prints.  Raises ``subprocess.TimeoutExpired`` if the
+    command (or anything still holding its pipes open) outlives *timeout*.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+        cwd=cwd,
+    )
+    out, err = _StreamTail(), _StreamTail()
+    readers = [
+        threading.Thread(target=out.drain, args=(proc.stdout,), daemon=True),
+        threading.Thread(target=err.drain, args=(proc.stderr,), daemon=True),
+    ]
+    for t in readers:
+        t.start()
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    for t in readers:
+        t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if t.is_alive():  # a background child still holds the pipe open
+            raise subprocess.TimeoutExpired(command, timeout)
+    return subprocess.CompletedProcess(command, returncode, out.text(), err.text())
+
+
 def run_shell(command: str, cwd: str = None, timeout: int = 90) -> str:
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=cwd or os.getcwd(),
-        )
+        # None inherits this process's working directory without a getcwd() call
+        result = _run_capture(command, cwd or None, timeout)
         output = ""
         if result.stdout:
             output += result.stdout
@@ -316,48 +418,122 @@ def run_shell(command: str, cwd: str = None, timeout: int = 90) -> str:
 
 def read_file(path: str, start_line: int = None, end_line: int = None) -> str:
     try:
-        p = Path(path).expanduser()
+        p = _p(path)
         if not p.exists():
             return f"[error] File not found: {path}"
         if p.stat().st_size > 2_000_000:
             return "[error] File too large (>2MB). Use start_line/end_line or grep."
-        lines = p.read_text(errors="replace").splitlines()
-        if start_line is not None or end_line is not None:
-            s = (start_line or 1) - 1
-            e = end_line or len(lines)
-            lines = lines[s:e]
-            prefix = start_line or 1
-        else:
-            prefix = 1
+        ranged = start_line is not None or end_line is not None
+        s = (start_line or 1) - 1
+        # Lines are split on newlines only, as the file iterator does, in both branches
+        # (grep numbers lines the same way); \f, \v and friends stay inside a line
+        with p.open(encoding=locale.getpreferredencoding(False), errors="replace") as f:
+            if ranged and s >= 0 and (end_line or 0) >= 0:
+                # Only read as far as the requested range reaches
+                lines = list(itertools.islice(f, s, end_line or None))
+            else:
+                lines = f.readlines()
+                if ranged:
+                    lines = lines[s:end_line or len(lines)]
+        prefix = start_line or 1
+        lines = [l.rstrip("\n") for l in lines]
         numbered = "\n".join(f"{prefix + i:4}: {l}" for i, l in enumerate(lines))
         return numbered if numbered else "(empty file)"
     except Exception as e:
         return f"[error] {e}"
 
 
-def write_file(path: str, content: str, append: bool = False) -> str:
+def write_file(path: str, content: str | bytes, append: bool = False) -> str:
     try:
-        p = Path(path).expanduser()
+        p = _p(path)
         p.parent.mkdir(parents=True, exist_ok=True)
-        mode = "a" if append else "w"
-        p.open(mode).write(content)
+        # Encode once, in the locale encoding read_file and edit_file decode with,
+        # and hand the buffer straight to write(2), bypassing buffered IO
+        encoding = locale.getpreferredencoding(False)
+        data = content if isinstance(content, bytes) else content.encode(encoding, "surrogateescape")
+        fd = os.open(p, os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC), 0o666)
+        try:
+            view = memoryview(data)
+            while view:  # os.write may write less than asked; EINTR is retried by Python
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
         action = "Appended" if append else "Written"
         return f"{action} {len(content)} chars to {path}"
     except Exception as e:
         return f"[error] {e}"
 
 
+_MMAP_MIN = 65_536
+
+
+@functools.lru_cache(maxsize=8)
+def _byte_searchable(encoding: str) -> bool:
+    """True if a decoded match always shows up as the encoded bytes in the raw file.
+
+    Holds for UTF-8 and single-byte codecs, which decode every byte on its own
+    (all 256 come back as 256 characters); multi-byte and stateful codecs are left
+    to the decoding path.
+    """
+    if codecs.lookup(encoding).name == "utf-8":
+        return True
+    try:
+        return len(bytes(range(256)).decode(encoding, "replace")) == 256
+    except LookupError:
+        return False
+
+
+def _definitely_absent(path: Path, old_text: str, encoding: str) -> bool:
+    """Byte-level check that *old_text* cannot occur in a large file, without decoding it.
+
+    Reading translates newlines, so only the longest single line of *old_text* is
+    searched for; text containing U+FFFD may match replaced bytes and is never rejected.
+    """
+    needle = max(old_text.split("\n"), key=len)
+    if not needle or "\ufffd" in needle or not _byte_searchable(encoding):
+        return False
+    try:
+        raw = needle.encode(encoding)
+    except UnicodeEncodeError:
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if os.fstat(fd).st_size < _MMAP_MIN:
+            return False
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        try:
+            return mm.find(raw) == -1
+        finally:
+            mm.close()
+    finally:
+        os.close(fd)
+
+
 def edit_file(path: str, old_text: str, new_text: str, replace_all: bool = False) -> str:
     try:
-        p = Path(path).expanduser()
+        p = _p(path)
         if not p.exists():
             return f"[error] File not found: {path}"
-        content = p.read_text(errors="replace")
-        if old_text not in content:
+        # The encoding read_text/write_text default to, pinned so the byte check agrees
+        encoding = locale.getpreferredencoding(False)
+        if _definitely_absent(p, old_text, encoding):
             return f"[error] old_text not found in {path}"
-        count = content.count(old_text) if replace_all else 1
-        new_content = content.replace(old_text, new_text) if replace_all else content.replace(old_text, new_text, 1)
-        p.write_text(new_content)
+        content = p.read_text(encoding=encoding, errors="replace")
+        delta = len(new_text) - len(old_text)
+        if delta:
+            # One replace pass; the length change tells us how many replacements happened
+            new_content = content.replace(old_text, new_text, -1 if replace_all else 1)
+            count = (len(new_content) - len(content)) // delta
+        elif replace_all:
+            count = content.count(old_text)
+            new_content = content.replace(old_text, new_text) if count else content
+        else:
+            i = content.find(old_text)
+            count = int(i >= 0)
+            new_content = content[:i] + new_text + content[i + len(old_text):] if count else content
+        if not count:
+            return f"[error] old_text not found in {path}"
+        p.write_text(new_content, encoding=encoding)
         return f"Replaced {count} occurrence(s) in {path}"
     except Exception as e:
         return f"[error] {e}"
@@ -377,14 +553,20 @@ def run_tests(
     return run_shell(cmd, cwd=cwd, timeout=timeout)
 
 
-def list_dir(path: str = ".", show_hidden: bool = False) -> str:
+def list_dir(path: str = ".", show_hidden: bool = False, *, _entries: list[os.DirEntry] = None) -> str:
+    """List *path*; ``_entries`` lets callers hand in a prebuilt ``os.scandir`` result."""
     try:
-        p = Path(path).expanduser()
-        if not p.exists():
-            return f"[error] Path not found: {path}"
-        entries = sorted(p.iterdir(), key=lambda x: (x.is_file(), x.name.lower()))
-        if not show_hidden:
-            entries = [e for e in entries if not e.name.startswith(".")]
+        if _entries is None:
+            try:
+                with os.scandir(_p(path)) as it:
+                    _entries = list(it)
+            except FileNotFoundError:
+                return f"[error] Path not found: {path}"
+        # DirEntry answers is_file/is_dir from d_type; only symlinks cost a stat
+        entries = sorted(
+            (e for e in _entries if show_hidden or not e.name.startswith(".")),
+            key=lambda x: (x.is_file(), x.name.lower()),
+        )
         if not entries:
             return "(empty directory)"
         lines = []
@@ -392,9 +574,9 @@ def list_dir(path: str = ".", show_hidden: bool = False) -> str:
             if e.is_dir():
                 lines.append(f"[DIR]  {e.name}/")
             elif e.is_symlink():
-                lines.append(f"[LNK]  {e.name} -> {e.resolve()}")
+                lines.append(f"[LNK]  {e.name} -> {os.path.realpath(e)}")
             else:
-                size = e.stat().st_size
+                size = e.stat(follow_symlinks=False).st_size
                 size_str = f"{size:>10,} B" if size < 1024 else (
                     f"{size/1024:>9.1f} KB" if size < 1_048_576 else f"{size/1_048_576:>9.1f} MB"
                 )
@@ -404,17 +586,251 @@ def list_dir(path: str = ".", show_hidden: bool = False) -> str:
         return f"[error] {e}"
 
 
+@functools.lru_cache(maxsize=128)
+def _glob_re(pattern: str) -> re.Pattern:
+    """Compile one glob segment to a regex, cached since the agent reuses globs."""
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _walk(root: str, pattern: str, files_only: bool = False) -> Iterator[str]:
+    """Yield paths under *root* matching a pathlib-style glob, via ``os.scandir``.
+
+    Each ``/``-separated segment is matched against entry names as an
+    ``fnmatch`` glob; ``**`` matches any number of directories (not following
+    symlinks), as in ``Path.glob``.  Segments without wildcards are looked up
+    directly rather than listed, so ``..`` works and a literal path costs no
+    ``scandir``.  A trailing ``/`` keeps only directories.  Entries are visited
+    depth-first in name order, so paths come out in
+    ``sorted(Path(root).glob(pattern))`` order without being collected first.
+    File/dir checks use the type info ``scandir`` already has, so no extra
+    ``stat`` per listed entry.
+    """
+    segs = [s for s in pattern.split("/") if s not in ("", ".")]
+    literal = [not any(c in s for c in "*?[") for s in segs]
+    match = [None if lit or s == "**" else _glob_re(s).match for s, lit in zip(segs, literal)]
+    n = len(segs)
+    dirs_only = pattern.endswith("/") or (bool(segs) and segs[-1] == "**")
+
+    def expand(states: set[int]) -> set[int]:
+        # "**" may match zero directories, so it also enables the next segment
+        for i in sorted(states):
+            j = i
+            while j < n and segs[j] == "**":
+                j += 1
+                states.add(j)
+        return states
+
+    def visit(dirpath: str, states: set[int]) -> Iterator[str]:
+        children: dict[str, set[int]] = {}
+        listed: dict[str, os.DirEntry] = {}
+        for i in states:
+            if literal[i]:
+                # Like pathlib's precise selector: the name must exist (a dir unless last)
+                path = os.path.join(dirpath, segs[i])
+                if (os.path.isdir if i + 1 < n or dirs_only else os.path.exists)(path):
+                    children.setdefault(segs[i], set()).add(i + 1)
+        wild = [i for i in states if not literal[i]]
+        if wild:
+            try:
+                with os.scandir(dirpath or ".") as it:
+                    entries = list(it)
+            except OSError:
+                entries = []
+            for de in entries:
+                nxt = {
+                    i if match[i] is None else i + 1
+                    for i in wild
+                    if (de.is_dir(follow_symlinks=False) if match[i] is None else match[i](de.name))
+                }
+                if nxt:
+                    children.setdefault(de.name, set()).update(nxt)
+                    listed[de.name] = de
+        for name in sorted(children):
+            nxt = expand(children[name])
+            path = os.path.join(dirpath, name)
+            de = listed.get(name)
+            is_dir = de.is_dir if de is not None else functools.partial(os.path.isdir, path)
+            if n in nxt:
+                if files_only:
+                    if de.is_file() if de is not None else os.path.isfile(path):
+                        yield path
+                elif not dirs_only or is_dir():
+                    yield path
+            if nxt - {n} and is_dir():
+                yield from visit(path, nxt - {n})
+
+    root = str(Path(root))
+    start = expand({0})
+    if n in start and not files_only and os.path.isdir(root):  # all-"**" pattern: the root itself
+        yield root
+    yield from visit("" if root == "." else root, start - {n})
+
+
 def find_files(pattern: str, root: str = ".") -> str:
+    # Same refusals as Path.glob; _walk would otherwise treat these as relative
+    if not pattern:
+        return f"[error] Unacceptable pattern: {pattern!r}"
+    if os.path.isabs(pattern):
+        return "[error] Non-relative patterns are unsupported"
     try:
-        root_path = Path(root).expanduser()
-        matches = sorted(root_path.glob(pattern))
+        root_path = _p(root)
+        # _walk yields in sorted order, so the first 200 are the 200 smallest
+        matches = list(itertools.islice(_walk(str(root_path), pattern), 200))
         if not matches:
             return f"No files matched '{pattern}' under {root}"
-        return "\n".join(str(m) for m in matches[:200])
+        return "\n".join(matches)
     except Exception as e:
         return f"[error] {e}"
 
 
+def _scan_lines(fp: str, lines, rx: re.Pattern, context_lines: int, budget: int) -> tuple[list[str], int]:
+    """Stream *lines* through *rx*, building one context block per match.
+
+    Only ``context_lines`` lines of look-behind are kept, in a ring buffer;
+    after-context is filled in as later lines arrive.  Stops once the match
+    count exceeds *budget*; the over-budget match gets no block.
+    Returns ``(blocks, match_count)``.
+    """
+    before: deque[str] = deque(maxlen=max(0, context_lines))
+    pending: list[list] = []  # [block lines, after-context lines still wanted]
+    blocks: list[list[str]] = []
+    count = 0
+    search = rx.search
+    numbered = enumerate(lines, 1)
+    for i, line in numbered:
+        line = line.rstrip("\n")
+        if pending:
+            for p in pending:
+                p[0].append(f"{fp}:{i}  {line}")
+                p[1] -= 1
+            pending = [p for p in pending if p[1]]
+        if search(line):
+            # The budget is only checked on a match, never on the per-line path
+            count += 1
+            if count > budget:
+                break
+            start = i - len(before)
+            block = [f"{fp}:{start + k}  {b}" for k, b in enumerate(before)]
+            block.append(f"{fp}:{i}> {line}")
+            blocks.append(block)
+            if context_lines > 0:
+                pending.append([block, context_lines])
+        before.append(line)
+    # Over budget: finish the after-context still owed, without searching further
+    while pending:
+        nxt = next(numbered, None)
+        if nxt is None:
+            break
+        i, line = nxt
+        line = line.rstrip("\n")
+        for p in pending:
+            p[0].append(f"{fp}:{i}  {line}")
+            p[1] -= 1
+        pending = [p for p in pending if p[1]]
+    return ["\n".join(b) for b in blocks], count
+
+
+def _scan_text(
+    fp: str, text: str, rx: re.Pattern, brx: re.Pattern, context_lines: int, budget: int
+) -> tuple[list[str], int]:
+    """Whole-buffer equivalent of :func:`_scan_lines`.
+
+    *brx* is *rx* compiled with ``re.MULTILINE``; for patterns that pass the
+    ``_LINE_LOCAL_UNSAFE`` screen, any line *rx* matches also holds a *brx*
+    match.  ``brx.search`` therefore skips in C straight to the next candidate
+    line, which is then confirmed with ``rx.search``; a file with few hits
+    costs a handful of calls rather than one per line.
+    """
+    blocks: list[str] = []
+    count = 0
+    end = len(text)
+    pos = 0     # always the start of a line
+    lineno = 1  # line number at pos
+
+    search, confirm = brx.search, rx.search
+
+    def line_at(start: int) -> tuple[int, int]:
+        stop = text.find("\n", start)
+        return start, end if stop == -1 else stop
+
+    while pos < end:
+        m = search(text, pos)
+        if m is None:
+            break
+        hit = m.start()
+        if hit == end and text.endswith("\n"):
+            break  # past the final newline: no such line
+        lineno += text.count("\n", pos, hit)
+        ls, le = line_at(text.rfind("\n", 0, hit) + 1)
+        line = text[ls:le]
+        if confirm(line):
+            count += 1
+            if count > budget:
+                break
+            block = [f"{fp}:{lineno}> {line}"]
+            bs, bn = ls, lineno
+            for _ in range(context_lines):
+                if bs == 0:
+                    break
+                bs = text.rfind("\n", 0, bs - 1) + 1
+                bn -= 1
+                block.insert(0, f"{fp}:{bn}  {text[bs:line_at(bs)[1]]}")
+            ae, an = le, lineno
+            for _ in range(context_lines):
+                if ae + 1 >= end:
+                    break
+                as_, ae = line_at(ae + 1)
+                an += 1
+                block.append(f"{fp}:{an}  {text[as_:ae]}")
+            blocks.append("\n".join(block))
+        pos = le + 1
+        lineno += 1
+    return blocks, count
+
+
+# Constructs that can match a line on its own yet fail once the text around it is
+# visible: \A / \Z, possessive quantifiers, and any "(?" group other than plain,
+# named or case/verbose-flag groups (so lookarounds, atomic groups, conditionals
+# and inline s / m flags).  Deliberately coarse: a false hit only means streaming.
+_LINE_LOCAL_UNSAFE = re.compile(r"\\[AZz]|[*+?}]\+|\(\?(?![aiLux]*[):]|P[<=])")
+
+
+def _scan_file(
+    fp: str, rx: re.Pattern, brx: re.Pattern | None, context_lines: int, budget: int
+) -> tuple[list[str], int]:
+    """Grep one file; unreadable files yield no matches.
+
+    Files up to 1MB are read whole and searched with *brx*; larger ones (or
+    any file when *brx* is None) are streamed line by line to bound memory.
+    """
+    try:
+        with open(fp, errors="replace") as f:
+            if brx is not None and os.fstat(f.fileno()).st_size <= 1_000_000:
+                return _scan_text(fp, f.read(), rx, brx, max(0, context_lines), budget)
+            return _scan_lines(fp, f, rx, context_lines, budget)
+    except Exception:
+        return [], 0
+
+
+def _imap_bounded(ex: ThreadPoolExecutor, fn: Callable, items: Iterable, window: int) -> Iterator:
+    """Like ``ex.map`` but keeps at most *window* items in flight ahead of the consumer.
+
+    Results come back in input order, and *items* is consumed lazily, so a
+    consumer that stops early never queues work for the rest of the input.
+    """
+    pending: deque[Future] = deque()
+    try:
+        for item in items:
+            pending.append(ex.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
 def grep(
     pattern: str,
     path: str = ".",
@@ -424,40 +840,30 @@ def grep(
 ) -> str:
     try:
         flags = re.IGNORECASE if case_insensitive else 0
-        rx = re.compile(pattern, flags)
-        target = Path(path).expanduser()
+        rx = _compile(pattern, flags)
+        brx = None if _LINE_LOCAL_UNSAFE.search(pattern) else _compile(pattern, flags | re.MULTILINE)
+        target = _p(path)
 
-        files: list[Path] = []
         if target.is_file():
-            files = [target]
+            files: Iterable[str] = [str(target)]
         else:
-            file_glob = glob or "*"
-            files = sorted(target.rglob(file_glob))
+            files = _walk(str(target), f"**/{glob or '*'}", files_only=True)
 
         results = []
         match_count = 0
 
-        for fp in files:
-            if not fp.is_file():
-                continue
-            try:
-                text = fp.read_text(errors="replace")
-            except Exception:
-                continue
-            lines = text.splitlines()
-            for i, line in enumerate(lines):
-                if rx.search(line):
-                    match_count += 1
-                    if match_count > 300:
-                        results.append("... (truncated, >300 matches)")
-                        return "\n".join(results)
-                    ctx_start = max(0, i - context_lines)
-                    ctx_end = min(len(lines), i + context_lines + 1)
-                    block = []
-                    for j in range(ctx_start, ctx_end):
-                        marker = ">" if j == i else " "
-                        block.append(f"{fp}:{j+1}{marker} {lines[j]}")
-                    results.append("\n".join(block))
+        # File reads release the GIL, so scanning many small files overlaps their I/O
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        scan = functools.partial(_scan_file, rx=rx, brx=brx, context_lines=context_lines, budget=300)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for blocks, n in _imap_bounded(ex, scan, files, workers * 2):
+                remaining = 300 - match_count
+                if n > remaining:
+                    results.extend(blocks[:remaining])
+                    results.append("... (truncated, >300 matches)")
+                    return "\n".join(results)
+                results.extend(blocks)
+                match_count += n
 
         if not results:
             return f"No matches for '{pattern}'"
@@ -468,6 +874,12 @@ def grep(
         return f"[error] {e}"
 
 
+@functools.lru_cache(maxsize=64)
+def _compile_eval(src: str):
+    """Compile python_eval source, cached so re-running a snippet skips the parser."""
+    return compile(src, "<python_eval>", "exec")
+
+
 def python_eval(code: str) -> str:
     import io
     import contextlib
@@ -476,26 +888,105 @@ def python_eval(code: str) -> str:
     buf = io.StringIO()
     try:
         with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
-            exec(textwrap.dedent(code), {})  # noqa: S102
+            exec(_compile_eval(textwrap.dedent(code)), {})  # noqa: S102
         result = buf.getvalue()
         return result.rstrip() if result else "(no output)"
     except Exception:
         return traceback.format_exc()
 
 
+# HTTP/2 lets concurrent fetches to one host share a connection; it needs the h2 package
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_HTTP_OPTS: dict = dict(
+    http2=_HTTP2,
+    follow_redirects=True,
+    timeout=15,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
+
+# Shared across fetch_url calls so repeat fetches reuse pooled keep-alive connections
+_HTTP_CLIENT: httpx.Client | None = None
+
+
+def _http_client() -> httpx.Client:
+    """Return the shared fetch_url client, creating it on first use."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.Client(**_HTTP_OPTS)
+        atexit.register(_HTTP_CLIENT.close)
+    return _HTTP_CLIENT
+
+
+_FETCH_LIMIT = 20_000
+
+
+def _format_response(resp: httpx.Response, text: str) -> str:
+    content_type = resp.headers.get("content-type", "")
+    if len(text) > _FETCH_LIMIT:
+        text = text[:_FETCH_LIMIT] + "\n...(truncated)"
+    return f"[HTTP {resp.status_code}] {content_type}\n\n{text}"
+
+
 def fetch_url(url: str, headers: dict = None) -> str:
     try:
-        with httpx.Client(follow_redirects=True, timeout=15) as client:
-            resp = client.get(url, headers=headers or {})
-            content_type = resp.headers.get("content-type", "")
-            text = resp.text
-            if len(text) > 20_000:
-                text = text[:20_000] + "\n...(truncated)"
-            return f"[HTTP {resp.status_code}] {content_type}\n\n{text}"
+        # Stream the body and hang up once past the limit, rather than downloading it all
+        with _http_client().stream("GET", url, headers=headers or {}) as resp:
+            chunks, n = [], 0
+            for chunk in resp.iter_text(chunk_size=4096):
+                chunks.append(chunk)
+                n += len(chunk)
+                if n > _FETCH_LIMIT:
+                    break
+            return _format_response(resp, "".join(chunks))
     except Exception as e:
         return f"[error] {e}"
 
 
+async def _fetch_one(client: httpx.AsyncClient, url: str, headers: dict) -> str:
+    async with client.stream("GET", url, headers=headers) as resp:
+        chunks, n = [], 0
+        async for chunk in resp.aiter_text(chunk_size=4096):
+            chunks.append(chunk)
+            n += len(chunk)
+            if n > _FETCH_LIMIT:
+                break
+        return _format_response(resp, "".join(chunks))
+
+
+async def _fetch_all(urls: list[str], headers: dict) -> list:
+    # An async client is bound to the event loop it first runs on, so each batch gets its own
+    async with httpx.AsyncClient(**_HTTP_OPTS) as client:
+        return await asyncio.gather(
+            *(_fetch_one(client, u, headers) for u in urls), return_exceptions=True
+        )
+
+
+def fetch_urls(urls: list[str], headers: dict = None) -> str:
+    if isinstance(urls, str):
+        # Models sometimes send the list double-encoded as a JSON string
+        decoded = None
+        if urls.lstrip().startswith("["):
+            try:
+                decoded = json.loads(urls)
+            except ValueError:
+                pass
+        if isinstance(decoded, list) and all(isinstance(u, str) for u in decoded):
+            urls = decoded
+        else:
+            urls = [urls]
+    if not urls:
+        return "[error] No URLs given"
+    try:
+        responses = asyncio.run(_fetch_all(urls, headers or {}))
+    except Exception as e:
+        return f"[error] {e}"
+    parts = []
+    for url, result in zip(urls, responses):
+        body = f"[error] {result}" if isinstance(result, Exception) else result
+        parts.append(f"=== {url} ===\n{body}")
+    return "\n\n".join(parts)
+
+
 # ── Dispatch ───────────────────────────────────────────────────────────────────
 
 TOOL_MAP: dict[str, Any] = {
@@ -509,6 +1000,7 @@ TOOL_MAP: dict[str, Any] = {
     "grep": grep,
     "python_eval": python_eval,
     "fetch_url": fetch_url,
+    "fetch_urls": fetch_urls,
 }
 
 # Risk level for each tool — used by the interactive permission system.
@@ -521,6 +1013,7 @@ TOOL_RISK: dict[str, str] = {
     "find_files":  "safe",
     "grep":        "safe",
     "fetch_url":   "safe",
+    "fetch_urls":  "safe",
     "write_file":  "confirm",
     "edit_file":   "confirm",
     "run_tests":   "confirm",
@@ -529,38 +1022,72 @@ TOOL_RISK: dict[str, str] = {
 }
 
 
+_TRUE = frozenset({"true", "True", "TRUE"})
+_FALSE = frozenset({"false", "False", "FALSE"})
+_INT_RE = re.compile(r"[+-]?\d+")
+_FLOAT_RE = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+|\d+(?=[eE]))(?:[eE][+-]?\d+)?")
+
+
 def _coerce_types(arguments: dict) -> dict:
     """Coerce string 'true'/'false' to bool, numeric strings to int/float."""
     result = {}
     for k, v in arguments.items():
         if isinstance(v, str):
-            if v.lower() == "true":
-                result[k] = True
-            elif v.lower() == "false":
-                result[k] = False
-            else:
-                # Try int then float
-                try:
-                    result[k] = int(v)
-                    continue
-                except ValueError:
-                    pass
+            if v in _TRUE:
+                v = True
+            elif v in _FALSE:
+                v = False
+            elif _INT_RE.fullmatch(v):
                 try:
-                    result[k] = float(v)
-                    continue
-                except ValueError:
+                    v = int(v)
+                except ValueError:  # longer than int's max str digits
                     pass
-                result[k] = v
-        else:
-            result[k] = v
+            elif _FLOAT_RE.fullmatch(v):
+                v = float(v)
+        result[k] = v
     return result
 
 
+def _adapter(fn: Callable[..., str]) -> Callable[[dict], str]:
+    """Build a caller that passes a tool's arguments positionally, in signature order.
+
+    Keyword-only parameters are internal hooks: naming one is an unexpected
+    argument, as for any other unknown name.  A missing required argument falls
+    back to a keyword call so Python raises its usual TypeError.
+    """
+    params = [
+        p for p in inspect.signature(fn).parameters.values()
+        if p.kind is p.POSITIONAL_OR_KEYWORD
+    ]
+    order = tuple((p.name, p.default) for p in params)
+    known = frozenset(p.name for p in params)
+    required = frozenset(p.name for p in params if p.default is p.empty)
+
+    def call(kwargs: dict) -> str:
+        unknown = kwargs.keys() - known
+        if unknown:
+            raise TypeError(f"{fn.__name__}() got an unexpected keyword argument {min(unknown)!r}")
+        if required <= kwargs.keys():
+            return fn(*[kwargs.get(n, d) for n, d in order])
+        return fn(**kwargs)
+
+    return call
+
+
+_ADAPTERS: dict[str, Callable[[dict], str]] = {name: _adapter(fn) for name, fn in TOOL_MAP.items()}
+
+
 def dispatch(name: str, arguments: dict) -> str:
-    fn = TOOL_MAP.get(name)
-    if fn is None:
+    call = _ADAPTERS.get(name)
+    if call is None:
         return f"[error] Unknown tool: {name}"
     try:
-        return fn(**_coerce_types(arguments))
+        return call(_coerce_types(arguments))
     except TypeError as e:
         return f"[error] Bad arguments for {name}: {e}"
+
+
+# Schemas never change at runtime, so they are serialized once and the bytes reused
+# on every chat request; the etag lets consumers tell whether they changed.
+TOOL_SCHEMAS_JSON: bytes = json.dumps(TOOL_SCHEMAS, separators=(",", ":")).encode()
+TOOL_SCHEMAS_ETAG: str = hashlib.blake2b(TOOL_SCHEMAS_JSON, digest_size=8).hexdigest()